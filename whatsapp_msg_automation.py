@@ -8,6 +8,7 @@ import sys
 import os
 import time
 import json
+import queue
 import random
 import threading
 from datetime import datetime
@@ -37,7 +38,10 @@ from presets import PresetManager
 APP_NAME = "WhatsApp Automation Studio"
 APP_VERSION = "1.0.0"
 DEFAULT_CONFIG_PATH = os.path.expanduser("~/whatsapp_automation_config.json")
-ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+DEFAULT_SESSION_STATE_PATH = os.path.expanduser("~/whatsapp_automation_session.jsonl")
+SESSION_SNAPSHOT_INTERVAL_MS = 5000
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(APP_DIR, "assets")
 os.makedirs(ASSETS_DIR, exist_ok=True)
 
 # Default configuration
@@ -141,6 +145,132 @@ class ConfigManager:
 # Ensure config_manager is initialized after the ConfigManager class definition
 config_manager = ConfigManager()
 
+
+class SessionStateManager:
+    """Crash-safe composer state snapshots stored as incremental JSONL records"""
+    # Number of appended records before the file is rewritten as one full snapshot
+    COMPACT_AFTER = 50
+
+    def __init__(self, state_path=DEFAULT_SESSION_STATE_PATH):
+        self.state_path = state_path
+        self.last_state = {}
+        self.record_count = 0
+        self.write_queue = queue.Queue()
+        self.writer = None
+
+    def load_state(self):
+        """Load the session state by merging all records in order"""
+        state = {}
+        self.record_count = 0
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as file:
+                    for line in file:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # A torn last line means we crashed mid-write; keep what we
+                            # have and rewrite the file on the next snapshot
+                            self.record_count = self.COMPACT_AFTER
+                            break
+                        if isinstance(record, dict):
+                            state.update(record)
+                            self.record_count += 1
+            except Exception as e:
+                print(f"Error loading session state: {e}")
+        self.last_state = dict(state)
+        return state
+
+    def snapshot(self, state):
+        """Queue the fields that changed since the last snapshot for writing"""
+        changes = {key: value for key, value in state.items() if self.last_state.get(key) != value}
+        if not changes:
+            return False
+
+        self.last_state = dict(state)
+        if self.record_count >= self.COMPACT_AFTER:
+            self.record_count = 1
+            self.write_queue.put((dict(state), True))
+        else:
+            self.record_count += 1
+            self.write_queue.put((changes, False))
+
+        # Writes happen on a background thread so the GUI never blocks on disk I/O
+        if self.writer is None:
+            self.writer = threading.Thread(target=self.write_records, daemon=True)
+            self.writer.start()
+        return True
+
+    def write_records(self):
+        """Background worker that writes queued records in order"""
+        while True:
+            record, compact = self.write_queue.get()
+            try:
+                line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n"
+                if compact:
+                    # Rewrite atomically so a crash never leaves a half-written snapshot
+                    temp_path = self.state_path + ".tmp"
+                    with open(temp_path, 'w', encoding='utf-8') as file:
+                        file.write(line)
+                        file.flush()
+                        os.fsync(file.fileno())
+                    os.replace(temp_path, self.state_path)
+                else:
+                    with open(self.state_path, 'a', encoding='utf-8') as file:
+                        file.write(line)
+                        file.flush()
+                        os.fsync(file.fileno())
+            except Exception as e:
+                print(f"Error saving session state: {e}")
+            finally:
+                self.write_queue.task_done()
+
+    def flush(self):
+        """Block until all queued records have been written"""
+        self.write_queue.join()
+
+
+class AssetCache:
+    """Decode image assets once and keep their scaled variants around"""
+    def __init__(self, base_dir=APP_DIR):
+        self.base_dir = base_dir
+        self._pixmaps = {}
+        self._icons = {}
+
+    def resolve(self, name):
+        """Resolve an asset name relative to the application directory"""
+        if os.path.isabs(name):
+            return name
+        return os.path.join(self.base_dir, name)
+
+    def pixmap(self, name, width=None, height=None):
+        """Get a decoded pixmap, optionally scaled to fit width x height"""
+        key = (name, width, height)
+        if key not in self._pixmaps:
+            if width is None or height is None:
+                pixmap = QPixmap(self.resolve(name))
+            else:
+                # Scale from the cached original so the file is only decoded once
+                pixmap = self.pixmap(name)
+                if not pixmap.isNull():
+                    pixmap = pixmap.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            self._pixmaps[key] = pixmap
+        return self._pixmaps[key]
+
+    def icon(self, name):
+        """Get an icon built from the cached pixmap"""
+        if name not in self._icons:
+            self._icons[name] = QIcon(self.pixmap(name))
+        return self._icons[name]
+
+    def clear(self):
+        """Drop all cached assets"""
+        self._pixmaps.clear()
+        self._icons.clear()
+
+# Shared asset cache; pixmaps are only decoded on first use, after QApplication exists
+asset_cache = AssetCache()
+
 # Update the play_button_click_sound function to dynamically check the sound_effects setting
 # Ensure the sound_effects setting is respected immediately without requiring a restart
 def play_button_click_sound():
@@ -411,15 +541,11 @@ class MessageSender(QThread):
 class SplashScreen(QSplashScreen):
     """Custom splash screen with logo"""
     def __init__(self):
-        # Use logo.png instead of a colored background
-        logo_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logo.png")
-        pixmap = QPixmap(logo_path)
-        
-        # If logo exists, use it and resize it to a smaller size
-        if not pixmap.isNull():
-            # Resize to a more reasonable size (300x200)
-            pixmap = pixmap.scaled(300, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        else:
+        # Use logo.png instead of a colored background, pre-scaled to 300x200
+        pixmap = asset_cache.pixmap("logo.png", 300, 200)
+        
+        # If logo doesn't exist, fall back to a plain background
+        if pixmap.isNull():
             # Fallback to a smaller green background
             pixmap = QPixmap(300, 200)
             pixmap.fill(QColor("#25D366"))
@@ -477,6 +603,41 @@ class SplashScreen(QSplashScreen):
         pass
 
 
+# Onboarding tutorial steps, shown only on first run
+ONBOARDING_STEPS = [
+    {
+        "title": "Welcome to WhatsApp Automation Studio!",
+        "content": "This app helps you automate sending WhatsApp messages. Let's walk through the basics.",
+        "image": None
+    },
+    {
+        "title": "Step 1: Login to WhatsApp",
+        "content": "First, you'll need to scan a QR code to login to WhatsApp Web.",
+        "image": None
+    },
+    {
+        "title": "Step 2: Prepare Your Messages",
+        "content": "Type or import the messages you want to send. You can also save them as presets for later use.",
+        "image": None
+    },
+    {
+        "title": "Step 3: Configure Settings",
+        "content": "Set delays between messages, enable typing simulation, and customize other options.",
+        "image": None
+    },
+    {
+        "title": "Step 4: Start Sending",
+        "content": "Select a chat in the browser, then click 'Start' to begin sending your messages.",
+        "image": None
+    },
+    {
+        "title": "Ready to Begin!",
+        "content": "You're all set! Remember to use this tool responsibly and follow WhatsApp's policies.",
+        "image": None
+    }
+]
+
+
 class OnboardingScreen(QWidget):
     """First-time user onboarding tutorial"""
     finished = pyqtSignal()
@@ -493,38 +654,7 @@ class OnboardingScreen(QWidget):
         self.setMinimumSize(600, 400)
         
         self.current_step = 0
-        self.steps = [
-            {
-                "title": "Welcome to WhatsApp Automation Studio!",
-                "content": "This app helps you automate sending WhatsApp messages. Let's walk through the basics.",
-                "image": None
-            },
-            {
-                "title": "Step 1: Login to WhatsApp",
-                "content": "First, you'll need to scan a QR code to login to WhatsApp Web.",
-                "image": None
-            },
-            {
-                "title": "Step 2: Prepare Your Messages",
-                "content": "Type or import the messages you want to send. You can also save them as presets for later use.",
-                "image": None
-            },
-            {
-                "title": "Step 3: Configure Settings",
-                "content": "Set delays between messages, enable typing simulation, and customize other options.",
-                "image": None
-            },
-            {
-                "title": "Step 4: Start Sending",
-                "content": "Select a chat in the browser, then click 'Start' to begin sending your messages.",
-                "image": None
-            },
-            {
-                "title": "Ready to Begin!",
-                "content": "You're all set! Remember to use this tool responsibly and follow WhatsApp's policies.",
-                "image": None
-            }
-        ]
+        self.steps = ONBOARDING_STEPS
         
         # Create UI
         layout = QVBoxLayout()
@@ -578,7 +708,7 @@ class OnboardingScreen(QWidget):
         self.content_label.setText(step["content"])
         
         if step["image"]:
-            self.image_label.setPixmap(QPixmap(step["image"]))
+            self.image_label.setPixmap(asset_cache.pixmap(step["image"]))
         else:
             self.image_label.clear()
         
@@ -657,6 +787,13 @@ class MainWindow(QMainWindow):
         self.sender = None
         self.is_logged_in = False
         
+        # Onboarding widgets are only built when the tutorial is actually shown
+        self.onboarding = None
+        
+        # Session state is restored after presets load and snapshotted periodically
+        self.session_state = SessionStateManager()
+        self.pending_preset = None
+        
         # Set application font
         font = QFont("Segoe UI", 10)  # More playful than default
         QApplication.setFont(font)
@@ -665,10 +802,16 @@ class MainWindow(QMainWindow):
         self.setup_ui()
         self.setup_connections()
         self.apply_theme()
+        self.restore_session_state()
         
         # Load presets into combo box
         QTimer.singleShot(100, self.delayed_preset_loading)
         
+        # Periodically snapshot the composer so a crash doesn't lose it
+        self.session_timer = QTimer(self)
+        self.session_timer.timeout.connect(self.save_session_state)
+        self.session_timer.start(SESSION_SNAPSHOT_INTERVAL_MS)
+        
         # Show onboarding for first-time users
         if self.config["first_run"]:
             QTimer.singleShot(500, self.show_onboarding)  # Show after a short delay
@@ -1155,7 +1298,7 @@ class MainWindow(QMainWindow):
         
         self.setStyleSheet(base_style)
         # Update the app icon to use the actual app logo
-        self.setWindowIcon(QIcon(os.path.join(os.path.dirname(os.path.abspath(__file__)), "logo.png")))
+        self.setWindowIcon(asset_cache.icon("logo.png"))
 
     def show_onboarding(self):
         self.onboarding = OnboardingScreen(self)
@@ -1171,7 +1314,7 @@ class MainWindow(QMainWindow):
     def finish_onboarding(self):
         """Complete onboarding process"""
         # Close onboarding window
-        if hasattr(self, 'onboarding'):
+        if self.onboarding:
             self.onboarding.close()
             self.onboarding = None
         
@@ -1213,6 +1356,17 @@ class MainWindow(QMainWindow):
             self.log("Cannot add empty message", "warning")
             return
         
+        self.message_list.addItem(self.create_message_item(text))
+        
+        self.log(f"Added message: '{text[:20]}...'", "success")
+        
+        # Play sound effect
+        if self.config["sound_effects"]:
+            # You could add sound effect here if you have sound files
+            pass
+    
+    def create_message_item(self, text):
+        """Create a list item showing a truncated message with the full text stored"""
         # Show full message in tooltip, truncate display text
         display_text = (text[:30] + "...") if len(text) > 30 else text
         display_text = display_text.replace("\n", "↵")  # Show newlines with symbol
@@ -1221,14 +1375,7 @@ class MainWindow(QMainWindow):
         item = QListWidgetItem(display_text)
         item.setToolTip(text)
         item.setData(Qt.UserRole, text)  # Store full message
-        self.message_list.addItem(item)
-        
-        self.log(f"Added message: '{text[:20]}...'", "success")
-        
-        # Play sound effect
-        if self.config["sound_effects"]:
-            # You could add sound effect here if you have sound files
-            pass
+        return item
     
     def clear_editor(self):
         """Clear message editor"""
@@ -1431,13 +1578,7 @@ class MainWindow(QMainWindow):
                     messages = preset["messages"]
                     for msg in messages:
                         # Add each message to the message list as a separate item
-                        display_text = (msg[:30] + "...") if len(msg) > 30 else msg
-                        display_text = display_text.replace("\n", "↵")
-                        
-                        item = QListWidgetItem(display_text)
-                        item.setToolTip(msg)
-                        item.setData(Qt.UserRole, msg)  # Store the full message
-                        self.message_list.addItem(item)
+                        self.message_list.addItem(self.create_message_item(msg))
                         
                     # Show the first message in editor for preview
                     if messages:
@@ -1452,13 +1593,7 @@ class MainWindow(QMainWindow):
                     self.message_preview.setText(message)
                     
                     # Also add to the message list for convenience
-                    display_text = (message[:30] + "...") if len(message) > 30 else message
-                    display_text = display_text.replace("\n", "↵")
-                    
-                    item = QListWidgetItem(display_text)
-                    item.setToolTip(message)
-                    item.setData(Qt.UserRole, message)
-                    self.message_list.addItem(item)
+                    self.message_list.addItem(self.create_message_item(message))
                     
                     self.log(f"Loaded preset: {preset['name']}", "success")
                 
@@ -1490,6 +1625,51 @@ class MainWindow(QMainWindow):
         """Load presets after a slight delay to ensure UI is fully initialized"""
         self.load_presets()
         self.log("Preset dropdown initialized", "info")
+        
+        # Reselect the preset from the restored session now that the combo is filled
+        if self.pending_preset:
+            index = self.preset_combo.findText(self.pending_preset)
+            if index >= 0:
+                self.preset_combo.setCurrentIndex(index)
+            self.pending_preset = None
+    
+    def collect_session_state(self):
+        """Collect the composer state to snapshot"""
+        messages = [self.message_list.item(i).data(Qt.UserRole) for i in range(self.message_list.count())]
+        return {
+            "messages": messages,
+            "repeat_count": self.repeat_count_spin.value(),
+            "preset": self.pending_preset or self.preset_combo.currentText(),
+            "editor": self.message_editor.toPlainText()
+        }
+    
+    def save_session_state(self):
+        """Snapshot the composer state; only changed fields are written"""
+        self.session_state.snapshot(self.collect_session_state())
+    
+    def restore_session_state(self):
+        """Restore the composer state saved by a previous session"""
+        state = self.session_state.load_state()
+        if not state:
+            return
+        
+        # Build all items with updates disabled so the list is laid out once
+        messages = state.get("messages") or []
+        self.message_list.setUpdatesEnabled(False)
+        try:
+            self.message_list.clear()
+            for msg in messages:
+                self.message_list.addItem(self.create_message_item(msg))
+        finally:
+            self.message_list.setUpdatesEnabled(True)
+        
+        if state.get("repeat_count"):
+            self.repeat_count_spin.setValue(state["repeat_count"])
+        if state.get("editor"):
+            self.message_editor.setPlainText(state["editor"])
+        self.pending_preset = state.get("preset") or None
+        
+        self.log(f"Restored previous session ({len(messages)} messages)", "info")
     
     def closeEvent(self, event):
         """Handle window close event"""
@@ -1497,6 +1677,11 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'browser') and self.browser and self.browser.isRunning():
             self.browser.close()
         
+        # Write a final session snapshot and wait for it to hit disk
+        self.session_timer.stop()
+        self.save_session_state()
+        self.session_state.flush()
+        
         # Save settings
         self.config_manager.save_config()
         event.accept()